@@ -1,6 +1,9 @@
+import asyncio
+import contextlib
 import logging
 import os
 import sys
+from typing import Optional
 import click
 import httpx
 import uvicorn
@@ -17,8 +20,17 @@ from a2a.types import (
     AgentSkill,
 )
 from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
 from app.langgraph_agent import CurrencyAgent
-from app.a2a_agent_executor import CurrencyAgentExecutor
+from app.a2a_agent_executor import ClientCallContextBuilder, CurrencyAgentExecutor
+from app.bulk_convert import bulk_convert
+from app.profiler import RequestProfiler
+from app.rate_provider import rate_provider
+from app.rate_table import rate_table
+from app.scheduler import RequestScheduler
+from app.task_store import RetentionTaskStore
 
 load_dotenv()
 
@@ -28,10 +40,55 @@ logger = logging.getLogger(__name__)
 class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
+def metrics_endpoint(task_store: RetentionTaskStore, scheduler: Optional[RequestScheduler],
+                     executor: CurrencyAgentExecutor):
+    async def metrics(request: Request) -> JSONResponse:
+        """Returns runtime counters for the agent as JSON."""
+        return JSONResponse({
+            'rate_prefetch': rate_provider.stats(),
+            'rate_table': rate_table.stats(),
+            'task_store': task_store.stats(),
+            'scheduler': scheduler.stats() if scheduler is not None else None,
+            'models': executor.agent.model_stats(),
+        })
+    return metrics
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Runs background tasks for the lifetime of the server."""
+    watcher = asyncio.create_task(rate_table.watch()) if rate_table.path else None
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await watcher
+
 @click.command()
 @click.option('--host', 'host', default='localhost')
 @click.option('--port', 'port', default=10000)
-def main(host, port):
+@click.option('--profile-every', 'profile_every', default=0,
+              help='Profile every Nth request (0 disables sampling).')
+@click.option('--profile-header', 'profile_header', is_flag=True, default=False,
+              help='Profile requests sent with the X-Profile-Request header.')
+@click.option('--profile-dir', 'profile_dir', default='profiles',
+              help='Directory for .prof and retained-memory reports.')
+@click.option('--task-ttl', 'task_ttl', default=3600.0,
+              help='Seconds to keep completed, failed or canceled tasks.')
+@click.option('--task-idle-timeout', 'task_idle_timeout', default=3600.0,
+              help='Seconds to keep input-required tasks without activity.')
+@click.option('--task-stale-timeout', 'task_stale_timeout', default=600.0,
+              help='Seconds to keep submitted or working tasks that stopped receiving updates.')
+@click.option('--task-max-count', 'task_max_count', default=10_000,
+              help='Evict finished tasks once more tasks than this are stored.')
+@click.option('--task-max-bytes', 'task_max_bytes', default=256 * 1024 * 1024,
+              help='Evict finished tasks once stored tasks exceed this many bytes (approximate).')
+@click.option('--max-concurrent-requests', 'max_concurrent_requests', default=16,
+              help='Agent runs allowed at once; more wait in fair, prioritized queues (0 disables).')
+def main(host, port, profile_every, profile_header, profile_dir,
+         task_ttl, task_idle_timeout, task_stale_timeout, task_max_count, task_max_bytes,
+         max_concurrent_requests):
     """Starts the Currency Agent server."""
     try:
         if not os.getenv('WATSONX_API_KEY'):
@@ -68,17 +125,59 @@ def main(host, port):
         push_config_store = InMemoryPushNotificationConfigStore()
         push_sender = BasePushNotificationSender(httpx_client=httpx_client,
                         config_store=push_config_store)
+        task_store = RetentionTaskStore(
+            InMemoryTaskStore(),
+            terminal_ttl=task_ttl,
+            idle_timeout=task_idle_timeout,
+            stale_timeout=task_stale_timeout,
+            max_tasks=task_max_count,
+            max_bytes=task_max_bytes,
+        )
+        scheduler = (
+            RequestScheduler(max_concurrent=max_concurrent_requests)
+            if max_concurrent_requests > 0 else None
+        )
+        profiler = None
+        routes = [Route('/v1/convert', bulk_convert, methods=['POST'])]
+        if profile_every > 0 or profile_header:
+            profiler = RequestProfiler(
+                sample_every=profile_every,
+                header_trigger=profile_header,
+                output_dir=profile_dir,
+            )
+
+            async def profiles(request: Request) -> JSONResponse:
+                try:
+                    limit = int(request.query_params.get('limit', '20'))
+                except ValueError:
+                    limit = 0
+                if limit <= 0:
+                    return JSONResponse({'error': 'limit must be a positive integer'}, status_code=400)
+                return JSONResponse(profiler.report(limit))
+
+            routes.append(Route('/admin/profiles', profiles, methods=['GET']))
+
+        agent_executor = CurrencyAgentExecutor(profiler=profiler, scheduler=scheduler)
+        routes.append(Route(
+            '/metrics', metrics_endpoint(task_store, scheduler, agent_executor), methods=['GET']
+        ))
         request_handler = DefaultRequestHandler(
-            agent_executor=CurrencyAgentExecutor(),
-            task_store=InMemoryTaskStore(),
+            agent_executor=agent_executor,
+            task_store=task_store,
             push_config_store=push_config_store,
             push_sender= push_sender
         )
         server = A2AStarletteApplication(
-            agent_card=agent_card, http_handler=request_handler
+            agent_card=agent_card,
+            http_handler=request_handler,
+            context_builder=ClientCallContextBuilder(),
         )
 
-        uvicorn.run(server.build(), host=host, port=port)
+        uvicorn.run(
+            server.build(routes=routes, lifespan=lifespan),
+            host=host,
+            port=port,
+        )
         # --8<-- [end:DefaultRequestHandler]
 
     except MissingAPIKeyError as e:
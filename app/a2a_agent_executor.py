@@ -1,13 +1,20 @@
 """Currency Conversion AgentExecutor Example
 From: https://github.com/a2aproject/a2a-samples/blob/d4fa006438e521b63a8c8145676f6df0c6b0aafa/samples/python/agents/langgraph/app/agent_executor.py"""
 
+import asyncio
 import logging
+import os
+from typing import Optional
+from uuid import uuid4
 from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.apps.jsonrpc import DefaultCallContextBuilder
+from a2a.server.context import ServerCallContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import (
     InternalError,
     InvalidParamsError,
+    Message,
     Part,
     TaskState,
     TextPart,
@@ -18,20 +25,175 @@ from a2a.utils import (
     new_task,
 )
 from a2a.utils.errors import ServerError
+from starlette.requests import Request
 from app.langgraph_agent import CurrencyAgent
+from app.profiler import RequestProfiler
+from app.rate_provider import PREFETCH_ENABLED, extract_currency_pairs, rate_provider
+from app.scheduler import Priority, RequestScheduler
 from app.tracer import trace_agent_start, trace_agent_end
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Working-status updates arriving within this window are merged into one event; 0 disables it.
+STATUS_COALESCE_MS = float(os.getenv('STATUS_COALESCE_MS', '0'))
+# Skips working-status texts already sent for the task; off keeps every update.
+STATUS_DEDUPE = os.getenv('STATUS_DEDUPE', 'false').lower() in ('true', '1', 'yes')
+# Fairness key for the scheduler. Without this header the authenticated user name is
+# used, then the peer address; behind a proxy every caller shares the proxy's address,
+# so callers there should send the header.
+CLIENT_ID_HEADER = 'x-client-id'
+
+class ClientCallContextBuilder(DefaultCallContextBuilder):
+    """Also records the peer address, which the default builder leaves out."""
+
+    def build(self, request: Request) -> ServerCallContext:
+        context = super().build(request)
+        if request.client is not None:
+            context.state['peer'] = request.client.host
+        return context
+
+class _StatusPublisher:
+    """Publishes working-status updates for one task.
+
+    Updates inside the coalescing window collapse into the latest one, texts
+    already sent for the task are skipped, and messages are copied from a
+    per-task template instead of being validated from scratch each time."""
+
+    def __init__(self, updater: TaskUpdater, context_id: str, task_id: str,
+                 coalesce_ms: float = STATUS_COALESCE_MS, dedupe: bool = STATUS_DEDUPE):
+        self.updater = updater
+        self.context_id = context_id
+        self.task_id = task_id
+        self.coalesce_seconds = coalesce_ms / 1000
+        self.dedupe = dedupe
+        self._templates: dict[str, Message] = {}
+        self._sent: set[str] = set()
+        self._pending_text: Optional[str] = None
+        # A timer closes the coalescing window; a task is only started if it fires
+        # with an update still held, so short bursts cost no task at all.
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._send_task: Optional[asyncio.Task] = None
+
+    def message(self, text: str) -> Message:
+        template = self._templates.get(text)
+        if template is None:
+            template = new_agent_text_message(text, self.context_id, self.task_id)
+            self._templates[text] = template
+            return template
+        return template.model_copy(update={'message_id': str(uuid4())})
+
+    async def working(self, text: str) -> None:
+        if self.dedupe and (text in self._sent or text == self._pending_text):
+            return
+        if self.coalesce_seconds <= 0:
+            await self._send(text)
+            return
+        self._pending_text = text
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.coalesce_seconds, self._window_closed)
+
+    async def flush(self) -> None:
+        """Sends any held update; call before publishing a terminal state."""
+        self._cancel_timer()
+        if self._send_task is not None:
+            await self._send_task
+        await self._send_pending()
+
+    def discard(self) -> None:
+        """Drops held updates once the run has ended without a terminal state."""
+        self._cancel_timer()
+        self._pending_text = None
+        if self._send_task is not None:
+            self._send_task.cancel()
+            self._send_task = None
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _window_closed(self) -> None:
+        self._timer = None
+        if self._pending_text is None:
+            return
+        if self._send_task is not None and not self._send_task.done():
+            # Keep updates in order: wait for the previous send to finish.
+            self._timer = asyncio.get_running_loop().call_later(self.coalesce_seconds, self._window_closed)
+            return
+        self._send_task = asyncio.ensure_future(self._send_pending())
+
+    async def _send_pending(self) -> None:
+        text, self._pending_text = self._pending_text, None
+        if text is None or (self.dedupe and text in self._sent):
+            return
+        await self._send(text)
+
+    async def _send(self, text: str) -> None:
+        self._sent.add(text)
+        await self.updater.update_status(TaskState.working, self.message(text))
+
 class CurrencyAgentExecutor(AgentExecutor):
-    def __init__(self):
-        self.agent = CurrencyAgent()
+    def __init__(self, agent: Optional[CurrencyAgent] = None,
+                 coalesce_ms: float = STATUS_COALESCE_MS, dedupe_status: bool = STATUS_DEDUPE,
+                 profiler: Optional[RequestProfiler] = None,
+                 scheduler: Optional[RequestScheduler] = None):
+        self.agent = agent or CurrencyAgent()
+        self.profiler = profiler
+        self.scheduler = scheduler
+        self.coalesce_ms = coalesce_ms
+        self.dedupe_status = dedupe_status
+        self._prefetch_tasks: set[asyncio.Task] = set()
 
     async def execute(
         self,
         context: RequestContext,
         event_queue: EventQueue,
+    ) -> None:
+        headers = context.call_context.state.get('headers', {}) if context.call_context else {}
+        if self.scheduler is None:
+            await self._run(context, event_queue, headers)
+            return
+        async with self.scheduler.slot(self._client(context, headers), self._priority(context)):
+            await self._run(context, event_queue, headers)
+
+    def _client(self, context: RequestContext, headers: dict) -> str:
+        # Must stay the same across a caller's conversations: keying on context_id would
+        # give every new conversation its own turn and reduce round-robin to FIFO.
+        client = headers.get(CLIENT_ID_HEADER)
+        if client:
+            return f'id:{client}'
+        call_context = context.call_context
+        if call_context is None:
+            return 'anonymous'
+        if call_context.user.is_authenticated:
+            return f'user:{call_context.user.user_name}'
+        return f"peer:{call_context.state.get('peer', 'unknown')}"
+
+    def _priority(self, context: RequestContext) -> Priority:
+        if context.current_task is not None:
+            return Priority.CONTINUATION
+        if extract_currency_pairs(context.get_user_input()):
+            return Priority.FAST_PATH
+        return Priority.NEW_CONVERSATION
+
+    async def _run(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
+        headers: dict,
+    ) -> None:
+        if self.profiler is not None:
+            if self.profiler.should_profile(headers):
+                async with self.profiler.profile(context.task_id or 'request'):
+                    await self._execute(context, event_queue)
+                return
+        await self._execute(context, event_queue)
+
+    async def _execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
     ) -> None:
         error = self._validate_request(context)
         if error:
@@ -44,34 +206,29 @@ class CurrencyAgentExecutor(AgentExecutor):
             await event_queue.enqueue_event(task)
         updater = TaskUpdater(event_queue, task.id, task.context_id)
         
+        status = _StatusPublisher(updater, task.context_id, task.id,
+                                  coalesce_ms=self.coalesce_ms, dedupe=self.dedupe_status)
+
         trace_agent_start(task.id, task.context_id, query)
+        self._start_prefetch(query)
         try:
             async for item in self.agent.stream(query, task.context_id):
                 is_task_complete = item['is_task_complete']
                 require_user_input = item['require_user_input']
 
                 if not is_task_complete and not require_user_input:
-                    await updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            item['content'],
-                            task.context_id,
-                            task.id,
-                        ),
-                    )
+                    await status.working(item['content'])
                 elif require_user_input:
+                    await status.flush()
                     await updater.update_status(
                         TaskState.input_required,
-                        new_agent_text_message(
-                            item['content'],
-                            task.context_id,
-                            task.id,
-                        ),
+                        status.message(item['content']),
                         final=True,
                     )
                     trace_agent_end(task.id, 'input_required')
                     break
                 else:
+                    await status.flush()
                     await updater.add_artifact(
                         [Part(root=TextPart(text=item['content']))],
                         name='conversion_result',
@@ -85,7 +242,28 @@ class CurrencyAgentExecutor(AgentExecutor):
             import traceback
             logger.error(f'Traceback: {traceback.format_exc()}')
             trace_agent_end(task.id, f'error: {type(e).__name__}')
-            raise ServerError(error=InternalError()) from e
+            # The failed state reports the error to the client and lets the task store evict
+            # the task. Raising as well would make the request handler drop the queued
+            # status event, so only raise when it could not be published.
+            try:
+                await updater.failed(status.message('The request could not be completed.'))
+            except Exception as publish_error:
+                logger.error(f'Could not mark task {task.id} as failed: '
+                             f'{type(publish_error).__name__}: {publish_error}')
+                raise ServerError(error=InternalError()) from e
+        finally:
+            status.discard()
+
+    def _start_prefetch(self, query: str) -> None:
+        # Runs alongside the first LLM call so the tool call that follows hits the cache.
+        if not PREFETCH_ENABLED:
+            return
+        pairs = extract_currency_pairs(query)
+        if not pairs:
+            return
+        prefetch = asyncio.create_task(rate_provider.prefetch(pairs))
+        self._prefetch_tasks.add(prefetch)
+        prefetch.add_done_callback(self._prefetch_tasks.discard)
 
     def _validate_request(self, context: RequestContext) -> bool:
         return False
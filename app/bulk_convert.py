@@ -0,0 +1,256 @@
+"""Bulk currency conversion endpoint
+
+Internal callers that only need numbers can POST rows of
+`{"amount": 1, "from": "USD", "to": "EUR", "date": "latest"}` directly,
+bypassing A2A and the LLM. The body is either a JSON object `{"rows": [...]}`
+(or a bare array), or NDJSON with one row per line
+(`Content-Type: application/x-ndjson`). The body is read in full, then
+converted in chunks whose results are streamed back as NDJSON, or as a streamed
+JSON document for JSON input. Rates come from the same rate table snapshot that
+`get_exchange_rate` uses, fixed for the whole request. The table only holds the
+latest rates; the tool answers any date with them, but here rows with a `date`
+other than "latest" get an error rather than a number labelled with that date."""
+
+import asyncio
+import json
+import math
+import re
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional
+import numpy as np
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from .rate_table import RateSnapshot, rate_table
+
+# Each chunk is converted without yielding to the event loop; 2000 rows take ~20ms.
+CHUNK_ROWS = 2_000
+# NDJSON bodies are split lazily into pieces of about this size, roughly CHUNK_ROWS rows.
+NDJSON_CHUNK_BYTES = 128 * 1024
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+class RateMatrix:
+    """Dense `from x to` rate matrix for one snapshot.
+
+    Index -1 addresses an extra all-NaN row and column, so unknown currencies
+    resolve to NaN without a separate mask."""
+
+    def __init__(self, snapshot: RateSnapshot):
+        self.version = snapshot.version
+        codes = set(snapshot.rates)
+        for targets in snapshot.rates.values():
+            codes.update(targets)
+        self.index = {code: i for i, code in enumerate(sorted(codes))}
+        size = len(self.index)
+        self.rates = np.full((size + 1, size + 1), np.nan)
+        for currency_from, targets in snapshot.rates.items():
+            for currency_to, rate in targets.items():
+                self.rates[self.index[currency_from], self.index[currency_to]] = rate
+
+_matrix: Optional[RateMatrix] = None
+
+def rate_matrix(snapshot: RateSnapshot) -> RateMatrix:
+    global _matrix
+    matrix = _matrix
+    if matrix is None or matrix.version != snapshot.version:
+        matrix = _matrix = RateMatrix(snapshot)
+    return matrix
+
+def convert_rows(rows: list[Any], matrix: RateMatrix) -> list[dict[str, Any]]:
+    """Converts a chunk of rows; invalid rows and unknown pairs get an `error`."""
+    count = len(rows)
+    index = matrix.index
+    amounts = np.empty(count)
+    src = np.empty(count, dtype=np.intp)
+    dst = np.empty(count, dtype=np.intp)
+    parsed: list[Optional[tuple[str, str, str]]] = []
+    for i, row in enumerate(rows):
+        try:
+            currency_from = str(row['from']).upper()
+            currency_to = str(row['to']).upper()
+            amount = float(row.get('amount', 1))
+            if not math.isfinite(amount):
+                raise ValueError(amount)
+            amounts[i] = amount
+            parsed.append((currency_from, currency_to, str(row.get('date', 'latest'))))
+        except (TypeError, KeyError, ValueError, AttributeError):
+            amounts[i] = math.nan
+            currency_from = currency_to = ''
+            parsed.append(None)
+        src[i] = index.get(currency_from, -1)
+        dst[i] = index.get(currency_to, -1)
+
+    rates = matrix.rates[src, dst]
+    with np.errstate(over='ignore', invalid='ignore'):
+        converted = amounts * rates
+
+    results: list[dict[str, Any]] = []
+    for i, fields in enumerate(parsed):
+        if fields is None:
+            results.append({'error': 'Invalid row: expected a finite amount, from and to'})
+            continue
+        currency_from, currency_to, currency_date = fields
+        result: dict[str, Any] = {
+            'amount': float(amounts[i]),
+            'from': currency_from,
+            'to': currency_to,
+            'date': currency_date,
+        }
+        rate = rates[i]
+        if currency_date != 'latest':
+            result['error'] = f'Exchange rate not available for {currency_date}; only "latest" is supported'
+        elif math.isnan(rate):
+            result['error'] = f'Exchange rate not available for {currency_from} to {currency_to}'
+        elif not math.isfinite(converted[i]):
+            result['error'] = 'Converted amount is out of range'
+        else:
+            result['rate'] = float(rate)
+            result['converted'] = float(converted[i])
+        results.append(result)
+    return results
+
+_encode = json.JSONEncoder(allow_nan=False).encode
+
+def _encode_lines(results: Iterable[dict[str, Any]]) -> str:
+    return ''.join(_encode(result) + '\n' for result in results)
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+def _parse_lines(lines: list[bytes]) -> list[Any]:
+    # One json.loads per chunk is several times faster than one per line;
+    # fall back to line by line when the chunk contains a bad line. Every line must be
+    # a single object so a malformed line cannot merge with its neighbour.
+    if not all(line.lstrip().startswith(b'{') and line.rstrip().endswith(b'}') for line in lines):
+        return [_parse_line(line) for line in lines]
+    try:
+        rows = json.loads(b'[' + b','.join(lines) + b']')
+    except ValueError:
+        return [_parse_line(line) for line in lines]
+    if len(rows) != len(lines):
+        return [_parse_line(line) for line in lines]
+    return rows
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def _skip(text: str, index: int) -> int:
+    return _WHITESPACE.match(text, index).end()  # type: ignore[union-attr]
+
+async def _parse_array(text: str, index: int) -> tuple[list[Any], int]:
+    items: list[Any] = []
+    index = _skip(text, index + 1)
+    if text.startswith(']', index):
+        return items, index + 1
+    while True:
+        item, index = _decoder.raw_decode(text, index)
+        items.append(item)
+        index = _skip(text, index)
+        if text.startswith(']', index):
+            return items, index + 1
+        if not text.startswith(',', index):
+            raise ValueError(f'Expected "," or "]" at {index}')
+        index = _skip(text, index + 1)
+        if len(items) % CHUNK_ROWS == 0:
+            await asyncio.sleep(0)
+
+async def _parse_object(text: str, index: int) -> tuple[dict[str, Any], int]:
+    fields: dict[str, Any] = {}
+    index = _skip(text, index + 1)
+    if text.startswith('}', index):
+        return fields, index + 1
+    while True:
+        key, index = _decoder.raw_decode(text, index)
+        if not isinstance(key, str):
+            raise ValueError(f'Expected a key at {index}')
+        index = _skip(text, index)
+        if not text.startswith(':', index):
+            raise ValueError(f'Expected ":" at {index}')
+        index = _skip(text, index + 1)
+        if text.startswith('[', index):
+            fields[key], index = await _parse_array(text, index)
+        else:
+            fields[key], index = _decoder.raw_decode(text, index)
+        index = _skip(text, index)
+        if text.startswith('}', index):
+            return fields, index + 1
+        if not text.startswith(',', index):
+            raise ValueError(f'Expected "," or "}}" at {index}')
+        index = _skip(text, index + 1)
+
+async def _parse_json_body(body: bytes) -> Any:
+    """`json.loads` for a request body that yields to the event loop while parsing.
+
+    The C decoder holds the GIL for the whole document, so parsing in a thread would
+    still stall the loop; instead the elements of the top-level array (or of the
+    arrays in a top-level object) are decoded one by one, pausing every CHUNK_ROWS."""
+    text = body.decode()
+    index = _skip(text, 0)
+    if text.startswith('[', index):
+        value, index = await _parse_array(text, index)
+    elif text.startswith('{', index):
+        value, index = await _parse_object(text, index)
+    else:
+        value, index = _decoder.raw_decode(text, index)
+    if _skip(text, index) != len(text):
+        raise ValueError(f'Extra data at {index}')
+    return value
+
+def _take_chunk(items: list[Any], start: int) -> list[Any]:
+    # Dropping the list's references frees a large body chunk by chunk; freeing a
+    # million parsed rows at once when the response ends stalls the loop for ~200ms.
+    chunk = items[start:start + CHUNK_ROWS]
+    items[start:start + CHUNK_ROWS] = [None] * len(chunk)
+    return chunk
+
+def _ndjson_chunks(body: bytes) -> Iterator[list[bytes]]:
+    # Splitting a large body in one go holds the event loop for over 100ms.
+    start = 0
+    while start < len(body):
+        end = body.find(b'\n', start + NDJSON_CHUNK_BYTES)
+        if end < 0:
+            end = len(body)
+        lines = [line for line in body[start:end].split(b'\n') if line.strip()]
+        if lines:
+            yield lines
+        start = end + 1
+
+# Each chunk is followed by asyncio.sleep(0): when the client keeps up, send() does not
+# suspend, and without it a large response would hold the event loop until it is done.
+async def _stream_ndjson(body: bytes, matrix: RateMatrix) -> AsyncIterator[str]:
+    for lines in _ndjson_chunks(body):
+        yield _encode_lines(convert_rows(_parse_lines(lines), matrix))
+        await asyncio.sleep(0)
+
+async def _stream_json(rows: list[Any], matrix: RateMatrix) -> AsyncIterator[str]:
+    yield f'{{"version": {matrix.version}, "results": ['
+    for start in range(0, len(rows), CHUNK_ROWS):
+        results = convert_rows(_take_chunk(rows, start), matrix)
+        separator = ', ' if start else ''
+        yield separator + ', '.join(_encode(result) for result in results)
+        await asyncio.sleep(0)
+    yield ']}'
+
+async def bulk_convert(request: Request):
+    """Converts a batch of amounts without going through the agent."""
+    matrix = rate_matrix(rate_table.snapshot)
+    headers = {'X-Rate-Table-Version': str(matrix.version)}
+    # Read the whole body here: a StreamingResponse generator must not call receive()
+    # while Starlette's disconnect listener is also consuming request messages.
+    body = await request.body()
+    if request.headers.get('content-type', '').startswith(NDJSON_MEDIA_TYPE):
+        return StreamingResponse(
+            _stream_ndjson(body, matrix), media_type=NDJSON_MEDIA_TYPE, headers=headers
+        )
+
+    try:
+        body = await _parse_json_body(body)
+    except ValueError:
+        return JSONResponse({'error': 'Request body is not valid JSON'}, status_code=400)
+    rows = body.get('rows') if isinstance(body, dict) else body
+    if not isinstance(rows, list):
+        return JSONResponse({'error': 'Expected a list of rows'}, status_code=400)
+    return StreamingResponse(
+        _stream_json(rows, matrix), media_type='application/json', headers=headers
+    )
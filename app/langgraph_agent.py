@@ -1,13 +1,15 @@
 import os
 from collections.abc import AsyncIterable
-from typing import Any, Literal
+from typing import Any, Literal, Optional
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 from langchain_ibm import ChatWatsonx
 from pydantic import BaseModel, SecretStr
-from .tools import get_exchange_rate
+from .model_router import RoutedChatModel
+from .tools import get_exchange_rate, tool_slots
 from .tracer import (
     trace_stream_start,
     trace_stream_end,
@@ -39,12 +41,47 @@ class CurrencyAgent:
         'Set response status to completed if the request is complete.'
     )
 
-    def __init__(self):
+    def __init__(self, model: Optional[BaseChatModel] = None):
+        self.model = model or self._build_model()
+
+        self.tools = [get_exchange_rate]
+        self.graph = create_react_agent(
+            self.model,
+            tools=self.tools,
+            checkpointer=memory,
+            prompt=self.SYSTEM_INSTRUCTION,
+            response_format=(self.FORMAT_INSTRUCTION, ResponseFormat),
+        )
+
+    @staticmethod
+    def _build_model() -> BaseChatModel:
+        # WATSONX_MODEL_IDS is an ordered, comma-separated list, e.g. a small Granite model
+        # first and the large model as fallback; with one id the model is used directly.
+        model_ids = [
+            model_id.strip()
+            for model_id in os.getenv("WATSONX_MODEL_IDS", "").split(",")
+            if model_id.strip()
+        ] or [os.getenv("WATSONX_MODEL_ID", "openai/gpt-oss-120b")]
+        models = [CurrencyAgent._watsonx_model(model_id) for model_id in model_ids]
+        if len(models) == 1:
+            return models[0]
+        return RoutedChatModel(
+            models=models,
+            names=model_ids,
+            hedge_after=float(os.getenv("MODEL_HEDGE_AFTER_SECONDS", "0")),
+            failure_threshold=int(os.getenv("MODEL_FAILURE_THRESHOLD", "3")),
+            cooldown=float(os.getenv("MODEL_COOLDOWN_SECONDS", "30")),
+            min_samples=int(os.getenv("MODEL_MIN_SAMPLES", "5")),
+            probe_every=int(os.getenv("MODEL_PROBE_EVERY", "20")),
+        )
+
+    @staticmethod
+    def _watsonx_model(model_id: str) -> ChatWatsonx:
         watsonx_url = os.getenv("WATSONX_URL", "https://us-south.ml.cloud.ibm.com")
         watsonx_apikey = os.getenv("WATSONX_API_KEY", "")
-        
-        self.model = ChatWatsonx(
-            model_id=os.getenv("WATSONX_MODEL_ID", "openai/gpt-oss-120b"),
+
+        return ChatWatsonx(
+            model_id=model_id,
             url=SecretStr(watsonx_url),
             apikey=SecretStr(watsonx_apikey),
             project_id=os.getenv("WATSONX_PROJECT_ID"),
@@ -55,20 +92,18 @@ class CurrencyAgent:
                 "top_k": int(os.getenv("WATSONX_TOP_K", "50")),
             }
         )
-        
-        self.tools = [get_exchange_rate]
-        self.graph = create_react_agent(
-            self.model,
-            tools=self.tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
-            response_format=(self.FORMAT_INSTRUCTION, ResponseFormat),
-        )
+
+    def model_stats(self) -> dict:
+        if isinstance(self.model, RoutedChatModel):
+            return self.model.router_stats()
+        return {}
 
     async def stream(self, query, context_id) -> AsyncIterable[dict[str, Any]]:
         trace_stream_start(context_id, query)
         inputs = {'messages': [('user', query)]}
-        config: RunnableConfig = {'configurable': {'thread_id': context_id}}  # type: ignore
+        config: RunnableConfig = {
+            'configurable': {'thread_id': context_id, **tool_slots()},
+        }  # type: ignore
 
         async for item in self.graph.astream(inputs, config, stream_mode='values'):
             if 'messages' not in item or not item['messages']:
@@ -0,0 +1,183 @@
+"""Routing across several chat models with fallback and hedged requests
+
+`RoutedChatModel` looks like a single chat model to LangGraph but sends each
+call to an ordered list of models. The first model that is healthy and not
+currently slow is tried first; if it fails the next one is tried. With hedging
+enabled, a second model is started when the first has not answered within
+`hedge_after` seconds, and whichever answers first wins. A model that fails
+`failure_threshold` times in a row is tried last for `cooldown` seconds. With
+hedging enabled, latency also counts: once a model has `min_samples` recent
+samples and their median is above `hedge_after`, it is moved behind the faster
+ones. Every `probe_every`th call keeps the configured order, so a demoted model
+still gets fresh samples and can recover before its old ones age out; the probe
+costs at most `hedge_after`, after which the hedge starts. Without hedging the
+configured order is kept and latency is only reported."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional, Sequence
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+from .tracer import Tracer
+
+class ModelStats:
+    def __init__(self, window_seconds: float = 60, max_samples: int = 200):
+        self.window_seconds = window_seconds
+        self.calls = 0
+        self.errors = 0
+        self.hedges_won = 0
+        self.consecutive_errors = 0
+        self.open_until = 0.0
+        self._samples: deque[tuple[float, float]] = deque(maxlen=max_samples)
+
+    def record_success(self, latency: float) -> None:
+        self.calls += 1
+        self.consecutive_errors = 0
+        self._samples.append((time.monotonic(), latency))
+
+    def record_abandoned(self, elapsed: float) -> None:
+        # A call cancelled after losing a hedge took at least this long; keep it as a
+        # latency sample so a slow model is demoted even though it never answers.
+        self._samples.append((time.monotonic(), elapsed))
+
+    def record_error(self, failure_threshold: int, cooldown: float) -> None:
+        self.calls += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= failure_threshold:
+            self.open_until = time.monotonic() + cooldown
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def recent_latencies(self) -> list[float]:
+        horizon = time.monotonic() - self.window_seconds
+        return sorted(latency for at, latency in self._samples if at >= horizon)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        latencies = self.recent_latencies()
+        if not latencies:
+            return None
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'hedges_won': self.hedges_won,
+            'healthy': self.healthy(),
+            'latency_p50': self.percentile(0.5),
+            'latency_p95': self.percentile(0.95),
+        }
+
+class RoutedChatModel(BaseChatModel):
+    models: list[Any]
+    names: list[str]
+    hedge_after: float = 0.0
+    failure_threshold: int = 3
+    cooldown: float = 30.0
+    min_samples: int = 5
+    probe_every: int = 20
+    # Shared with the copies made by bind_tools, so every binding feeds the same stats.
+    stats: dict[str, ModelStats] = Field(default_factory=dict)
+
+    def model_post_init(self, context: Any, /) -> None:
+        for name in self.names:
+            self.stats.setdefault(name, ModelStats())
+
+    @property
+    def _llm_type(self) -> str:
+        return 'routed-chat-model'
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> 'RoutedChatModel':
+        return self.model_copy(update={
+            'models': [model.bind_tools(tools, **kwargs) for model in self.models],
+        })
+
+    def _slow(self, name: str) -> bool:
+        latencies = self.stats[name].recent_latencies()
+        return len(latencies) >= self.min_samples and latencies[len(latencies) // 2] > self.hedge_after
+
+    def _candidates(self) -> list[int]:
+        """Model indexes in the order to try them."""
+        healthy = [i for i, name in enumerate(self.names) if self.stats[name].healthy()]
+        broken = [i for i in range(len(self.names)) if i not in healthy]
+        calls = sum(stats.calls for stats in self.stats.values())
+        if self.hedge_after > 0 and calls % self.probe_every:
+            # sorted() is stable, so the configured order holds among equally fast models.
+            healthy.sort(key=lambda i: self._slow(self.names[i]))
+        return healthy + broken
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        error: Optional[BaseException] = None
+        for i in self._candidates():
+            name = self.names[i]
+            started = time.monotonic()
+            try:
+                message = self.models[i].invoke(messages, stop=stop, **kwargs)
+            except Exception as e:
+                self.stats[name].record_error(self.failure_threshold, self.cooldown)
+                Tracer.trace('model', 'MODEL_FALLBACK', model=name, error=f'{type(e).__name__}: {e}')
+                error = e
+                continue
+            self.stats[name].record_success(time.monotonic() - started)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        assert error is not None
+        raise error
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        candidates = self._candidates()
+        pending: dict[asyncio.Task, tuple[str, float]] = {}
+        error: Optional[BaseException] = None
+        answered = False
+
+        def launch() -> None:
+            i = candidates.pop(0)
+            task = asyncio.ensure_future(self.models[i].ainvoke(messages, stop=stop, **kwargs))
+            pending[task] = (self.names[i], time.monotonic())
+
+        launch()
+        try:
+            while pending:
+                hedging = self.hedge_after > 0 and candidates
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_after if hedging else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    Tracer.trace('model', 'MODEL_HEDGE', model=self.names[candidates[0]],
+                                 after_seconds=self.hedge_after)
+                    launch()
+                    continue
+                for task in done:
+                    name, started = pending.pop(task)
+                    if task.exception() is None:
+                        self.stats[name].record_success(time.monotonic() - started)
+                        if any(other < started for _, other in pending.values()):
+                            self.stats[name].hedges_won += 1
+                        answered = True
+                        return ChatResult(generations=[ChatGeneration(message=task.result())])
+                    error = task.exception()
+                    self.stats[name].record_error(self.failure_threshold, self.cooldown)
+                    Tracer.trace('model', 'MODEL_FALLBACK', model=name,
+                                 error=f'{type(error).__name__}: {error}')
+                if not pending and candidates:
+                    launch()
+        finally:
+            for task, (name, started) in pending.items():
+                task.cancel()
+                # Only a hedge loser is known to be slower than the winner; a call cut short
+                # because the caller was cancelled says nothing about the model's latency.
+                if answered:
+                    self.stats[name].record_abandoned(time.monotonic() - started)
+        assert error is not None
+        raise error
+
+    def router_stats(self) -> dict:
+        return {name: self.stats[name].as_dict() for name in self.names}
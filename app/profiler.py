@@ -0,0 +1,160 @@
+"""Opt-in CPU and memory profiling for single A2A requests
+
+A request is profiled when it carries the `X-Profile-Request` header (if header
+triggering is enabled) or when it is the Nth request since the last sample.
+cProfile and tracemalloc observe the whole thread, so work for other requests
+interleaved on the event loop is included in a sample; only one request is
+profiled at a time.
+
+Memory is reported two ways. The tracemalloc peak above the starting level shows
+how much short-lived data (pydantic models, LangChain messages) a request built
+up at once, but not where. The per-line report compares snapshots taken before
+and after the request, so it only attributes memory still held at the end;
+objects allocated and freed during the request do not appear in it."""
+
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Mapping
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'x-profile-request'
+
+class RequestProfiler:
+    def __init__(
+        self,
+        sample_every: int = 0,
+        header_trigger: bool = True,
+        output_dir: str = 'profiles',
+        keep: int = 20,
+        top: int = 50,
+    ):
+        self.sample_every = sample_every
+        self.header_trigger = header_trigger
+        self.output_dir = output_dir
+        self.top = top
+        self._samples: deque[dict[str, Any]] = deque(maxlen=keep)
+        self._requests = 0
+        self._active = False
+        self._lock = threading.Lock()
+
+    def should_profile(self, headers: Mapping[str, str]) -> bool:
+        with self._lock:
+            self._requests += 1
+            if self._active:
+                return False
+            if self.header_trigger and headers.get(PROFILE_HEADER, '').lower() in ('true', '1', 'yes'):
+                return True
+            return self.sample_every > 0 and self._requests % self.sample_every == 0
+
+    @asynccontextmanager
+    async def profile(self, request_id: str) -> AsyncIterator[None]:
+        with self._lock:
+            if self._active:
+                busy = True
+            else:
+                busy = False
+                self._active = True
+        if busy:
+            yield
+            return
+
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            if started_tracemalloc:
+                tracemalloc.stop()
+            with self._lock:
+                self._active = False
+            try:
+                sample = await asyncio.to_thread(
+                    self._record, request_id, elapsed, profile, before, after,
+                    peak_bytes - start_bytes,
+                )
+                logger.info(f"Profiled request {request_id} in {elapsed:.3f}s: {sample['path']}")
+            except Exception as e:
+                logger.error(f'Could not record profile for request {request_id}: {type(e).__name__}: {e}')
+
+    def _record(
+        self,
+        request_id: str,
+        elapsed: float,
+        profile: cProfile.Profile,
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+        peak_bytes: int,
+    ) -> dict[str, Any]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{request_id}")
+        profile.dump_stats(f'{base}.prof')
+
+        retained = [
+            diff for diff in after.compare_to(before, 'lineno')
+            if diff.size_diff > 0
+            and not diff.traceback[0].filename.startswith((tracemalloc.__file__, __file__))
+        ][:self.top]
+        with open(f'{base}.retained.txt', 'w') as f:
+            for diff in retained:
+                f.write(f'{diff}\n')
+
+        stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+        cpu = sorted(
+            ((f'{path}:{line}({func})', entry[2]) for (path, line, func), entry in stats.items()),
+            key=lambda site: site[1],
+            reverse=True,
+        )[:self.top]
+        sample = {
+            'request_id': request_id,
+            'path': f'{base}.prof',
+            'elapsed_seconds': elapsed,
+            'peak_bytes': peak_bytes,
+            'cpu': cpu,
+            'retained': [
+                (f'{diff.traceback[0].filename}:{diff.traceback[0].lineno}', diff.size_diff)
+                for diff in retained
+            ],
+        }
+        with self._lock:
+            self._samples.append(sample)
+        return sample
+
+    def report(self, limit: int = 20) -> dict[str, Any]:
+        """Aggregates the heaviest call sites over the retained samples."""
+        with self._lock:
+            samples = list(self._samples)
+            requests_seen = self._requests
+        cpu: Counter[str] = Counter()
+        retained: Counter[str] = Counter()
+        for sample in samples:
+            cpu.update(dict(sample['cpu']))
+            retained.update(dict(sample['retained']))
+        return {
+            'requests_seen': requests_seen,
+            'samples': [
+                {key: sample[key] for key in ('request_id', 'path', 'elapsed_seconds', 'peak_bytes')}
+                for sample in samples
+            ],
+            'top_cpu_self_seconds': cpu.most_common(limit),
+            'top_retained_bytes': retained.most_common(limit),
+        }
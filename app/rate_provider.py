@@ -0,0 +1,195 @@
+"""Exchange rate provider with an in-memory cache and speculative prefetch
+
+The executor warms the cache with the currency pairs found in the user's query
+while the first LLM call is in flight, so the `get_exchange_rate` tool call that
+follows is usually served from memory. Cache entries remember the rate table
+snapshot they were read from and are ignored once a newer snapshot is live.
+
+Cache hits take no lock: a lookup is a plain dict read, and a store is a single
+assignment per entry. Stores and the expiry sweep share a lock among writers
+only, and the hit counters are updated without it, so they are approximate when
+the sync tool runs on several threads."""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+from .rate_table import RateTable, rate_table
+from .tracer import Tracer
+
+PREFETCH_ENABLED = os.getenv('RATE_PREFETCH_ENABLED', 'true').lower() in ('true', '1', 'yes')
+CACHE_TTL_SECONDS = float(os.getenv('RATE_CACHE_TTL_SECONDS', '60'))
+FETCH_MAX_WORKERS = int(os.getenv('RATE_FETCH_MAX_WORKERS', '16'))
+# Keys include the LLM-supplied date and unknown pairs are cached as misses, so bound the cache.
+CACHE_MAX_ENTRIES = int(os.getenv('RATE_CACHE_MAX_ENTRIES', '10000'))
+
+_CURRENCY_TOKEN = re.compile(r'\b[A-Za-z]{3}\b')
+
+class RateProvider:
+    def __init__(self, table: Optional[RateTable] = None, ttl_seconds: float = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.table = rate_table if table is None else table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: dict[tuple[str, str, str], tuple[float, int, Optional[float]]] = {}
+        self._speculative: set[tuple[str, str, str]] = set()
+        self._inflight: dict[tuple[str, str, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        # Dedicated pool so slow fetches neither block the loop nor starve asyncio.to_thread users.
+        self._executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix='rate-fetch')
+        self._lookups = 0
+        self._cache_hits = 0
+        self._prefetched = 0
+        self._prefetch_hits = 0
+
+    def currencies(self) -> set[str]:
+        rates = self.table.snapshot.rates
+        codes = set(rates)
+        for targets in rates.values():
+            codes.update(targets)
+        return codes
+
+    def _fetch(self, currency_from: str, currency_to: str, currency_date: str) -> Optional[float]:
+        """Looks up a rate from the backing source, bypassing the cache."""
+        return self.table.snapshot.get(currency_from, currency_to)
+
+    def _cached(self, key: tuple[str, str, str]) -> tuple[bool, Optional[float]]:
+        # Expired and stale entries are left for the sweep in _store, so reads never mutate.
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires_at, version, rate = entry
+        if expires_at < time.monotonic() or version != self.table.snapshot.version:
+            return False, None
+        return True, rate
+
+    def _claim_prefetch_hit(self, key: tuple[str, str, str]) -> None:
+        # set.remove is atomic, so only one reader counts a prefetched entry.
+        try:
+            self._speculative.remove(key)
+        except KeyError:
+            return
+        self._prefetch_hits += 1
+
+    def _store(self, key: tuple[str, str, str], rate: Optional[float], version: int,
+               speculative: bool = False) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # Re-inserting keeps the dict in write order, which with a fixed TTL is also expiry order.
+            self._cache.pop(key, None)
+            if speculative:
+                self._speculative.add(key)
+            else:
+                self._speculative.discard(key)
+            self._cache[key] = (now + self.ttl_seconds, version, rate)
+            if speculative:
+                self._prefetched += 1
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        # Expired entries sit at the front, so this stops at the first live one.
+        while self._cache:
+            key, (expires_at, _, _) = next(iter(self._cache.items()))
+            if expires_at >= now and len(self._cache) <= self.max_entries:
+                break
+            del self._cache[key]
+            self._speculative.discard(key)
+
+    def _lookup_cached(self, key: tuple[str, str, str]) -> tuple[bool, Optional[float]]:
+        self._lookups += 1
+        found, rate = self._cached(key)
+        if found:
+            self._cache_hits += 1
+            self._claim_prefetch_hit(key)
+        return found, rate
+
+    def get_rate(self, currency_from: str, currency_to: str, currency_date: str = 'latest') -> Optional[float]:
+        """Returns the rate for a pair, or None if the pair is not available."""
+        key = (currency_from.upper(), currency_to.upper(), currency_date)
+        found, rate = self._lookup_cached(key)
+        if found:
+            return rate
+        version = self.table.snapshot.version
+        rate = self._fetch(*key)
+        self._store(key, rate, version)
+        return rate
+
+    async def aget_rate(self, currency_from: str, currency_to: str, currency_date: str = 'latest') -> Optional[float]:
+        """Async variant of `get_rate`; the backing fetch runs on the provider's thread pool."""
+        key = (currency_from.upper(), currency_to.upper(), currency_date)
+        found, rate = self._lookup_cached(key)
+        if found:
+            return rate
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # A fetch for this pair is already running, most likely a prefetch; share its result.
+            rate = await asyncio.shield(inflight)
+            self._claim_prefetch_hit(key)
+            return rate
+        return await self._fetch_async(key)
+
+    async def _fetch_async(self, key: tuple[str, str, str], speculative: bool = False) -> Optional[float]:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        version = self.table.snapshot.version
+        try:
+            rate = await asyncio.get_running_loop().run_in_executor(self._executor, self._fetch, *key)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a prefetch failure nobody waits on is not logged.
+            future.exception()
+            raise
+        else:
+            self._store(key, rate, version, speculative=speculative)
+            future.set_result(rate)
+            return rate
+        finally:
+            self._inflight.pop(key, None)
+
+    async def prefetch(self, pairs: Iterable[tuple[str, str]], currency_date: str = 'latest') -> None:
+        """Warms the cache for the given pairs without blocking the event loop."""
+        keys = []
+        for currency_from, currency_to in pairs:
+            key = (currency_from.upper(), currency_to.upper(), currency_date)
+            if not self._cached(key)[0]:
+                keys.append(key)
+        if not keys:
+            return
+        Tracer.trace('prefetch', 'RATE_PREFETCH', pairs=[f'{k[0]}->{k[1]}' for k in keys])
+        await asyncio.gather(
+            *(self._fetch_async(key, speculative=True) for key in keys if key not in self._inflight),
+            return_exceptions=True,
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._cache),
+                'lookups': self._lookups,
+                'cache_hits': self._cache_hits,
+                'prefetched': self._prefetched,
+                'prefetch_hits': self._prefetch_hits,
+                'prefetch_hit_rate': (
+                    self._prefetch_hits / self._prefetched if self._prefetched else 0.0
+                ),
+            }
+
+def extract_currency_pairs(query: str, known: Optional[set[str]] = None) -> list[tuple[str, str]]:
+    """Guesses the pairs a query will ask for: the first currency against each later one."""
+    known = rate_provider.currencies() if known is None else known
+    codes: list[str] = []
+    for token in _CURRENCY_TOKEN.findall(query):
+        code = token.upper()
+        if code in known and code not in codes:
+            codes.append(code)
+    if len(codes) < 2:
+        return []
+    return [(codes[0], code) for code in codes[1:]]
+
+rate_provider = RateProvider()
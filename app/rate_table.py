@@ -0,0 +1,123 @@
+"""Hot-reloadable exchange rate table
+
+Rates are read from `EXCHANGE_RATES_FILE` (JSON in the same shape as
+`EXCHANGE_RATES`, or CSV with `from,to,rate` columns) into an immutable,
+versioned snapshot. A background task polls the file's mtime and swaps in a new
+snapshot when it changes; readers just take `rate_table.snapshot` and never lock.
+A file that is empty (for example half-written) or holds a non-finite or
+non-positive rate is rejected and the previous snapshot stays live. Without a
+file the built-in mocked rates are served as version 0."""
+
+import asyncio
+import csv
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional
+from .exchange_rates import EXCHANGE_RATES
+from .tracer import Tracer
+
+logger = logging.getLogger(__name__)
+
+RATES_FILE = os.getenv('EXCHANGE_RATES_FILE')
+POLL_SECONDS = float(os.getenv('EXCHANGE_RATES_POLL_SECONDS', '5'))
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    version: int
+    rates: Mapping[str, Mapping[str, float]]
+    source: str = 'builtin'
+    loaded_at: float = field(default_factory=time.time)
+
+    def get(self, currency_from: str, currency_to: str) -> Optional[float]:
+        return self.rates.get(currency_from, {}).get(currency_to)
+
+def _freeze(rates: Mapping[str, Mapping[str, float]]) -> Mapping[str, Mapping[str, float]]:
+    return MappingProxyType({
+        currency_from.upper(): MappingProxyType({
+            currency_to.upper(): float(rate) for currency_to, rate in targets.items()
+        })
+        for currency_from, targets in rates.items()
+    })
+
+def _validate(rates: Mapping[str, Mapping[str, float]]) -> None:
+    if not any(rates.values()):
+        raise ValueError('no rates in file')
+    for currency_from, targets in rates.items():
+        for currency_to, rate in targets.items():
+            if not math.isfinite(rate) or rate <= 0:
+                raise ValueError(f'invalid rate {rate!r} for {currency_from} to {currency_to}')
+
+def load_rate_file(path: str) -> dict[str, dict[str, float]]:
+    """Parses a JSON or CSV rate file into a nested `{from: {to: rate}}` dict."""
+    if path.endswith('.csv'):
+        rates: dict[str, dict[str, float]] = {}
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                rates.setdefault(row['from'], {})[row['to']] = float(row['rate'])
+        return rates
+    with open(path) as f:
+        rates = json.load(f)
+    if not isinstance(rates, dict) or not all(isinstance(t, dict) for t in rates.values()):
+        raise ValueError('expected an object of the form {"USD": {"EUR": 0.9}}')
+    return rates
+
+class RateTable:
+    def __init__(self, path: Optional[str] = RATES_FILE, poll_seconds: float = POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._signature: Optional[tuple[int, int]] = None
+        self.snapshot = RateSnapshot(version=0, rates=_freeze(EXCHANGE_RATES))
+        if path:
+            self.reload()
+
+    def reload(self) -> bool:
+        """Loads the file if it changed since the last load; returns True on swap."""
+        if not self.path:
+            return False
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            logger.error(f'Could not read exchange rates from {self.path}: {e}')
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        # Remembered even if parsing fails, so a bad file is reported once rather than every poll.
+        self._signature = signature
+        try:
+            rates = _freeze(load_rate_file(self.path))
+            _validate(rates)
+        except Exception as e:
+            logger.error(f'Could not load exchange rates from {self.path}: {type(e).__name__}: {e}')
+            return False
+        # A single attribute assignment, so readers see either the old or the new table.
+        self.snapshot = RateSnapshot(
+            version=self.snapshot.version + 1,
+            rates=rates,
+            source=self.path,
+        )
+        Tracer.trace('reload', 'RATE_TABLE_RELOADED',
+                     version=self.snapshot.version, source=self.path, currencies=len(rates))
+        return True
+
+    async def watch(self) -> None:
+        """Polls the rate file until cancelled."""
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            await asyncio.to_thread(self.reload)
+
+    def stats(self) -> dict:
+        snapshot = self.snapshot
+        return {
+            'version': snapshot.version,
+            'source': snapshot.source,
+            'loaded_at': snapshot.loaded_at,
+            'currencies': len(snapshot.rates),
+        }
+
+rate_table = RateTable()
@@ -0,0 +1,103 @@
+"""Admission scheduler for agent executions
+
+Limits how many `CurrencyAgentExecutor` runs are in flight and decides who goes
+next when requests have to wait. Waiting requests are grouped by priority class
+and served strictly in class order; inside a class, clients take turns
+round-robin, so one client flooding the server only lengthens its own queue."""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator
+
+class Priority(IntEnum):
+    CONTINUATION = 0  # follow-up to a task that asked the user for input
+    FAST_PATH = 1  # the query names an explicit currency pair
+    NEW_CONVERSATION = 2
+
+class RequestScheduler:
+    def __init__(self, max_concurrent: int = 16, window: int = 1000):
+        self.max_concurrent = max_concurrent
+        self._running = 0
+        # priority -> client -> waiters, clients in round-robin order.
+        self._queues: dict[Priority, OrderedDict[str, deque[asyncio.Future]]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._waits: dict[Priority, deque[float]] = {
+            priority: deque(maxlen=window) for priority in Priority
+        }
+        self._admitted: dict[Priority, int] = {priority: 0 for priority in Priority}
+
+    def queued(self) -> int:
+        return sum(len(waiters) for clients in self._queues.values() for waiters in clients.values())
+
+    @asynccontextmanager
+    async def slot(self, client: str, priority: Priority) -> AsyncIterator[None]:
+        """Waits for an execution slot and holds it for the duration of the block."""
+        enqueued_at = time.monotonic()
+        if self._running < self.max_concurrent and not self.queued():
+            self._running += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._queues[priority].setdefault(client, deque()).append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just as we were cancelled; pass it on.
+                    self._release()
+                else:
+                    self._forget(priority, client, waiter)
+                raise
+        self._waits[priority].append(time.monotonic() - enqueued_at)
+        self._admitted[priority] += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _forget(self, priority: Priority, client: str, waiter: asyncio.Future) -> None:
+        waiters = self._queues[priority].get(client)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._queues[priority][client]
+
+    def _release(self) -> None:
+        # The slot moves straight to the next waiter, so _running only drops when nobody waits.
+        for priority in Priority:
+            clients = self._queues[priority]
+            while clients:
+                client, waiters = next(iter(clients.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    clients.move_to_end(client)
+                else:
+                    del clients[client]
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._running -= 1
+
+    def stats(self) -> dict:
+        classes = {}
+        for priority in Priority:
+            waits = sorted(self._waits[priority])
+            classes[priority.name.lower()] = {
+                'admitted': self._admitted[priority],
+                'queued': sum(len(waiters) for waiters in self._queues[priority].values()),
+                'queue_seconds_avg': sum(waits) / len(waits) if waits else 0.0,
+                'queue_seconds_p95': waits[int(len(waits) * 0.95)] if waits else 0.0,
+                'queue_seconds_max': waits[-1] if waits else 0.0,
+            }
+        return {
+            'max_concurrent': self.max_concurrent,
+            'running': self._running,
+            'classes': classes,
+        }
@@ -0,0 +1,153 @@
+"""Task store with retention limits
+
+`InMemoryTaskStore` keeps every task, with its full history and artifacts, for
+the lifetime of the process. `RetentionTaskStore` wraps any `TaskStore` and
+deletes finished tasks (completed, failed, canceled, rejected) once they are
+older than `terminal_ttl`, or earlier when the store holds more than
+`max_tasks` tasks or `max_bytes` of approximate task data. Tasks waiting for
+the user (input-required, auth-required) are kept until they have been idle for
+`idle_timeout`. Tasks still submitted or working are only evicted once they have
+not been saved for `stale_timeout`, which catches runs that died without
+reaching a terminal state. Eviction runs on each save, since only saves make the
+store grow."""
+
+import logging
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Optional
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Artifact, Message, Task, TaskState
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = {TaskState.completed, TaskState.failed, TaskState.canceled, TaskState.rejected}
+WAITING_STATES = {TaskState.input_required, TaskState.auth_required}
+
+def _parts_bytes(parts) -> int:
+    size = 0
+    for part in parts:
+        root = part.root
+        text = getattr(root, 'text', None)
+        if text is not None:
+            size += len(text)
+        else:
+            size += 256
+    return size
+
+def approximate_task_bytes(task: Task) -> int:
+    """Rough in-memory size of a task, without serializing it."""
+    size = 512
+    messages: list[Message] = list(task.history or [])
+    if task.status.message is not None:
+        messages.append(task.status.message)
+    for message in messages:
+        size += 256 + _parts_bytes(message.parts)
+    artifacts: list[Artifact] = task.artifacts or []
+    for artifact in artifacts:
+        size += 256 + _parts_bytes(artifact.parts)
+    return size
+
+class RetentionTaskStore(TaskStore):
+    def __init__(
+        self,
+        inner: TaskStore,
+        terminal_ttl: float = 3600,
+        idle_timeout: float = 3600,
+        stale_timeout: float = 600,
+        max_tasks: int = 10_000,
+        max_bytes: int = 256 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.inner = inner
+        self.terminal_ttl = terminal_ttl
+        self.idle_timeout = idle_timeout
+        self.stale_timeout = stale_timeout
+        self.max_tasks = max_tasks
+        self.max_bytes = max_bytes
+        self.clock = clock
+        # task_id -> time of the last save, oldest first within each group.
+        self._terminal: OrderedDict[str, float] = OrderedDict()
+        self._waiting: OrderedDict[str, float] = OrderedDict()
+        self._active: OrderedDict[str, float] = OrderedDict()
+        self._bytes: dict[str, int] = {}
+        self._total_bytes = 0
+        self._evicted: Counter[str] = Counter()
+
+    async def save(self, task: Task, context: Optional[ServerCallContext] = None) -> None:
+        await self.inner.save(task, context)
+        self._track(task)
+        await self._evict()
+
+    async def get(self, task_id: str, context: Optional[ServerCallContext] = None) -> Optional[Task]:
+        return await self.inner.get(task_id, context)
+
+    async def delete(self, task_id: str, context: Optional[ServerCallContext] = None) -> None:
+        self._untrack(task_id)
+        await self.inner.delete(task_id, context)
+
+    def _track(self, task: Task) -> None:
+        self._untrack(task.id)
+        now = self.clock()
+        if task.status.state in TERMINAL_STATES:
+            self._terminal[task.id] = now
+        elif task.status.state in WAITING_STATES:
+            self._waiting[task.id] = now
+        else:
+            self._active[task.id] = now
+        size = approximate_task_bytes(task)
+        self._bytes[task.id] = size
+        self._total_bytes += size
+
+    def _untrack(self, task_id: str) -> None:
+        self._terminal.pop(task_id, None)
+        self._waiting.pop(task_id, None)
+        self._active.pop(task_id, None)
+        self._total_bytes -= self._bytes.pop(task_id, 0)
+
+    def _victims(self) -> list[tuple[str, str]]:
+        now = self.clock()
+        victims = []
+        # Both groups are ordered by last save, so expired entries are at the front.
+        for task_id, saved_at in self._terminal.items():
+            if saved_at + self.terminal_ttl > now:
+                break
+            victims.append((task_id, 'ttl'))
+        for task_id, saved_at in self._waiting.items():
+            if saved_at + self.idle_timeout > now:
+                break
+            victims.append((task_id, 'idle'))
+        for task_id, saved_at in self._active.items():
+            if saved_at + self.stale_timeout > now:
+                break
+            victims.append((task_id, 'stale'))
+        for task_id, _ in victims:
+            self._untrack(task_id)
+        # Over a cap: drop the oldest finished tasks; waiting and running tasks stay.
+        while self._terminal and (
+            len(self._bytes) > self.max_tasks or self._total_bytes > self.max_bytes
+        ):
+            task_id = next(iter(self._terminal))
+            self._untrack(task_id)
+            victims.append((task_id, 'capacity'))
+        return victims
+
+    async def _evict(self) -> None:
+        for task_id, reason in self._victims():
+            if task_id in self._bytes:
+                continue  # saved again while an earlier delete was awaited
+            self._evicted[reason] += 1
+            try:
+                await self.inner.delete(task_id)
+            except Exception as e:
+                logger.error(f'Could not evict task {task_id}: {type(e).__name__}: {e}')
+
+    def stats(self) -> dict:
+        return {
+            'tasks': len(self._bytes),
+            'terminal': len(self._terminal),
+            'waiting': len(self._waiting),
+            'active': len(self._active),
+            'approx_bytes': self._total_bytes,
+            'evicted': dict(self._evicted),
+        }
@@ -1,12 +1,47 @@
 """Currency conversion tools for the agent
 Extended from: https://github.com/a2aproject/a2a-samples/blob/d4fa006438e521b63a8c8145676f6df0c6b0aafa/samples/python/agents/langgraph/app/agent_executor.py"""
 
-from langchain_core.tools import tool
-from .exchange_rates import EXCHANGE_RATES
+import asyncio
+import os
+from contextlib import nullcontext
+from typing import Optional
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from .rate_provider import rate_provider
 from .tracer import trace_tool_execution_start, trace_tool_execution_end
 
-@tool
-def get_exchange_rate(
+# Upper bound on tool calls from one agent run that execute at the same time.
+TOOL_MAX_CONCURRENCY = int(os.getenv('TOOL_MAX_CONCURRENCY', '8'))
+
+def tool_slots(limit: int = TOOL_MAX_CONCURRENCY) -> dict:
+    """`configurable` entry that bounds concurrent tool calls for one graph invocation.
+
+    ToolNode runs all tool calls of a model turn with a plain `asyncio.gather`, so
+    the bound is a semaphore passed in the run's config; create it per invocation,
+    inside the event loop that runs the graph."""
+    return {'tool_slots': asyncio.Semaphore(limit)}
+
+def _exchange_rate_result(
+    rate: Optional[float],
+    currency_from: str,
+    currency_to: str,
+    currency_date: str,
+) -> dict:
+    if rate is not None:
+        return {
+            'rate': rate,
+            'from': currency_from,
+            'to': currency_to,
+            'date': currency_date
+        }
+    return {
+        'error': f'Exchange rate not available for {currency_from} to {currency_to}',
+        'from': currency_from,
+        'to': currency_to,
+        'date': currency_date
+    }
+
+def _get_exchange_rate(
     currency_from: str = 'USD',
     currency_to: str = 'EUR',
     currency_date: str = 'latest',
@@ -25,21 +60,33 @@ def get_exchange_rate(
     trace_tool_execution_start('get_exchange_rate')
     currency_from = currency_from.upper()
     currency_to = currency_to.upper()
-    if currency_from in EXCHANGE_RATES and currency_to in EXCHANGE_RATES[currency_from]:
-        rate = EXCHANGE_RATES[currency_from][currency_to]
-        result = {
-            'rate': rate,
-            'from': currency_from,
-            'to': currency_to,
-            'date': currency_date
-        }
-    else:
-        result = {
-            'error': f'Exchange rate not available for {currency_from} to {currency_to}',
-            'from': currency_from,
-            'to': currency_to,
-            'date': currency_date
-        }
+    rate = rate_provider.get_rate(currency_from, currency_to, currency_date)
+    result = _exchange_rate_result(rate, currency_from, currency_to, currency_date)
     trace_tool_execution_end('get_exchange_rate', result)
-    
-    return result
\ No newline at end of file
+
+    return result
+
+async def _aget_exchange_rate(
+    currency_from: str = 'USD',
+    currency_to: str = 'EUR',
+    currency_date: str = 'latest',
+    config: RunnableConfig = None,  # type: ignore[assignment]
+):
+    """Async implementation of `get_exchange_rate` used when the graph runs with `astream`."""
+
+    slots = (config or {}).get('configurable', {}).get('tool_slots')
+    async with slots if slots is not None else nullcontext():
+        trace_tool_execution_start('get_exchange_rate')
+        currency_from = currency_from.upper()
+        currency_to = currency_to.upper()
+        rate = await rate_provider.aget_rate(currency_from, currency_to, currency_date)
+        result = _exchange_rate_result(rate, currency_from, currency_to, currency_date)
+        trace_tool_execution_end('get_exchange_rate', result)
+
+    return result
+
+get_exchange_rate = StructuredTool.from_function(
+    func=_get_exchange_rate,
+    coroutine=_aget_exchange_rate,
+    name='get_exchange_rate',
+)
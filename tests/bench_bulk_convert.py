@@ -0,0 +1,88 @@
+"""Benchmark: bulk conversion endpoint at 1M rows
+
+Posts one million NDJSON rows to /v1/convert on an in-process Starlette app
+and reports end-to-end throughput, plus the throughput of the conversion step
+on its own. The same rows are then posted as one JSON document. During both
+requests a ticker task records the longest event-loop stall, which is how long
+other requests on the server would have had to wait."""
+
+import os
+os.environ.setdefault('ENABLE_TRACING', 'false')
+
+import asyncio
+import json
+import random
+import time
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Route
+from app.bulk_convert import CHUNK_ROWS, NDJSON_MEDIA_TYPE, bulk_convert, convert_rows, rate_matrix
+from app.rate_table import rate_table
+
+ROWS = 1_000_000
+CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD', 'CNY', 'INR']
+
+async def longest_stall(stop: asyncio.Event) -> float:
+    worst = 0.0
+    last = time.perf_counter()
+    # sleep(0) keeps the ticker in the ready queue, so each gap is one run of other work.
+    while not stop.is_set():
+        await asyncio.sleep(0)
+        now = time.perf_counter()
+        worst = max(worst, now - last)
+        last = now
+    return worst
+
+def make_rows() -> list[dict]:
+    rng = random.Random(42)
+    return [
+        {
+            'amount': round(rng.uniform(1, 10_000), 2),
+            'from': rng.choice(CURRENCIES[:3]),
+            'to': rng.choice(CURRENCIES),
+            'date': 'latest',
+        }
+        for _ in range(ROWS)
+    ]
+
+async def main() -> None:
+    print("=" * 60)
+    print("Benchmark: bulk conversion")
+    print("=" * 60)
+    rows = make_rows()
+    body = ''.join(json.dumps(row) + '\n' for row in rows).encode()
+    print(f"  - Rows: {ROWS:,}")
+    print(f"  - Request body: {len(body) / 1e6:.1f} MB")
+    print("-" * 60)
+
+    matrix = rate_matrix(rate_table.snapshot)
+    start = time.perf_counter()
+    for offset in range(0, ROWS, CHUNK_ROWS):
+        convert_rows(rows[offset:offset + CHUNK_ROWS], matrix)
+    elapsed = time.perf_counter() - start
+    print(f"  - convert_rows: {elapsed:.2f}s ({ROWS / elapsed:,.0f} rows/s)")
+
+    app = Starlette(routes=[Route('/v1/convert', bulk_convert, methods=['POST'])])
+    transport = httpx.ASGITransport(app=app)
+    json_body = json.dumps({'rows': rows}).encode()
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for name, content, media_type, count in (
+            ('NDJSON', body, NDJSON_MEDIA_TYPE, lambda r: r.text.count('\n')),
+            ('JSON', json_body, 'application/json', lambda r: len(r.json()['results'])),
+        ):
+            stop = asyncio.Event()
+            ticker = asyncio.create_task(longest_stall(stop))
+            start = time.perf_counter()
+            response = await client.post(
+                '/v1/convert', content=content, headers={'Content-Type': media_type}
+            )
+            elapsed = time.perf_counter() - start
+            stop.set()
+            stall = await ticker
+            assert response.status_code == 200 and count(response) == ROWS, response.status_code
+            print(f"  - /v1/convert {name:<6} {elapsed:.2f}s ({ROWS / elapsed:,.0f} rows/s), "
+                  f"longest loop stall {stall * 1000:.0f}ms")
+    print("-" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Benchmark: model routing with fallback and hedged requests
+
+Uses stub chat models with fixed latencies in place of watsonx.ai to show
+- a hedged request answered by the fast fallback instead of the slow primary,
+- fallback when the primary fails, and the primary being skipped once it has
+  failed repeatedly,
+- a slow primary being demoted behind the fallback once it has enough latency
+  samples, and being tried first again on a probe call,
+- a call cancelled by its caller leaving no latency sample behind."""
+
+import os
+os.environ.setdefault('ENABLE_TRACING', 'false')
+
+import asyncio
+import time
+from typing import Any
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from app.langgraph_agent import CurrencyAgent
+from app.model_router import RoutedChatModel
+
+class StubChatModel(BaseChatModel):
+    name: str
+    latency: float
+    fail: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return 'stub'
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> 'StubChatModel':
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f'{self.name} unavailable')
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.name))])
+
+def router(primary: StubChatModel, fallback: StubChatModel, hedge_after: float) -> RoutedChatModel:
+    return RoutedChatModel(
+        models=[primary, fallback],
+        names=[primary.name, fallback.name],
+        hedge_after=hedge_after,
+        failure_threshold=3,
+        cooldown=30,
+    )
+
+async def timed(model: RoutedChatModel) -> tuple[str, float]:
+    start = time.perf_counter()
+    message = await model.ainvoke([HumanMessage(content='How much is 1 USD in EUR?')])
+    return str(message.content), time.perf_counter() - start
+
+async def main() -> None:
+    print("=" * 60)
+    print("Benchmark: model router")
+    print("=" * 60)
+    slow = StubChatModel(name='large (1.0s)', latency=1.0)
+    fast = StubChatModel(name='small (0.1s)', latency=0.1)
+
+    answer, elapsed = await timed(router(slow, fast, hedge_after=0))
+    print(f"  - No hedging:          {elapsed:.2f}s answered by {answer}")
+    answer, elapsed = await timed(router(slow, fast, hedge_after=0.2))
+    print(f"  - Hedge after 0.2s:    {elapsed:.2f}s answered by {answer}")
+
+    model = router(slow, fast, hedge_after=0.2)
+    hedged = 0
+    while (await timed(model))[1] > 0.2:
+        hedged += 1
+    print(f"  - Slow primary demoted after {hedged} hedged calls")
+    answer, elapsed = await timed(model)
+    print(f"  - Next call:           {elapsed:.2f}s answered by {answer}")
+    while sum(stats.calls for stats in model.stats.values()) % model.probe_every:
+        await timed(model)
+    answer, elapsed = await timed(model)
+    print(f"  - Probe call:          {elapsed:.2f}s answered by {answer} (slow primary tried first)")
+    print(f"    stats: {model.router_stats()}")
+
+    model = router(slow, fast, hedge_after=0)
+    call = asyncio.ensure_future(timed(model))
+    await asyncio.sleep(0.05)
+    call.cancel()
+    await asyncio.gather(call, return_exceptions=True)
+    samples = model.router_stats()[slow.name]['latency_p50']
+    assert samples is None, samples
+    print(f"  - Cancelled by caller: no latency sample recorded for {slow.name}")
+
+    broken = StubChatModel(name='broken (0.05s)', latency=0.05, fail=True)
+    model = router(broken, fast, hedge_after=0)
+    for i in range(4):
+        answer, elapsed = await timed(model)
+        print(f"  - Failing primary #{i + 1}:  {elapsed:.2f}s answered by {answer}")
+    print(f"    stats: {model.router_stats()}")
+
+    agent = CurrencyAgent(model=router(slow, fast, hedge_after=0.2))
+    print(f"  - CurrencyAgent graph built with router: {type(agent.graph).__name__}")
+    print("-" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main())
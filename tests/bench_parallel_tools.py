@@ -0,0 +1,89 @@
+"""Benchmark: several get_exchange_rate calls in one model turn
+
+Runs the graph's ToolNode on an AIMessage carrying N tool calls against a stub
+provider that sleeps on every fetch, and compares it with running the same
+calls one after another. Concurrent execution should take ~1x the latency, and
+~2x with the per-run bound set to half the number of calls."""
+
+import os
+os.environ.setdefault('ENABLE_TRACING', 'false')
+
+import asyncio
+import time
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode
+import app.tools
+from app.rate_provider import RateProvider
+from app.tools import TOOL_MAX_CONCURRENCY, get_exchange_rate, tool_slots
+
+LATENCY_SECONDS = 0.2
+PAIRS = [
+    ('USD', 'EUR'), ('USD', 'GBP'), ('USD', 'JPY'), ('USD', 'CHF'),
+    ('EUR', 'USD'), ('EUR', 'GBP'), ('GBP', 'USD'), ('GBP', 'EUR'),
+]
+
+class SlowRateProvider(RateProvider):
+    def _fetch(self, currency_from, currency_to, currency_date):
+        time.sleep(LATENCY_SECONDS)
+        return super()._fetch(currency_from, currency_to, currency_date)
+
+def tool_calls_message() -> AIMessage:
+    return AIMessage(
+        content='',
+        tool_calls=[
+            {
+                'name': 'get_exchange_rate',
+                'args': {'currency_from': currency_from, 'currency_to': currency_to},
+                'id': f'call_{i}',
+            }
+            for i, (currency_from, currency_to) in enumerate(PAIRS)
+        ],
+    )
+
+async def run_sequential() -> float:
+    app.tools.rate_provider = SlowRateProvider(ttl_seconds=0)
+    start = time.perf_counter()
+    for currency_from, currency_to in PAIRS:
+        await get_exchange_rate.ainvoke(
+            {'currency_from': currency_from, 'currency_to': currency_to}
+        )
+    return time.perf_counter() - start
+
+async def run_tool_node(limit: int) -> float:
+    app.tools.rate_provider = SlowRateProvider(ttl_seconds=0)
+    builder = StateGraph(MessagesState)
+    builder.add_node('tools', ToolNode([get_exchange_rate]))
+    builder.add_edge(START, 'tools')
+    builder.add_edge('tools', END)
+    graph = builder.compile()
+    start = time.perf_counter()
+    result = await graph.ainvoke(
+        {'messages': [tool_calls_message()]},
+        {'configurable': tool_slots(limit)},
+    )
+    elapsed = time.perf_counter() - start
+    assert len(result['messages']) == len(PAIRS) + 1
+    return elapsed
+
+async def main() -> None:
+    print("=" * 60)
+    print("Benchmark: parallel tool execution")
+    print("=" * 60)
+    print(f"  - Tool calls: {len(PAIRS)}")
+    print(f"  - Latency per call: {LATENCY_SECONDS:.3f}s")
+    print(f"  - Max concurrency: {TOOL_MAX_CONCURRENCY}")
+    print("-" * 60)
+
+    sequential = await run_sequential()
+    concurrent = await run_tool_node(TOOL_MAX_CONCURRENCY)
+    bounded = await run_tool_node(len(PAIRS) // 2)
+    print(f"  - Sequential:            {sequential:.3f}s ({sequential / LATENCY_SECONDS:.1f}x latency)")
+    print(f"  - ToolNode:              {concurrent:.3f}s ({concurrent / LATENCY_SECONDS:.1f}x latency)")
+    print(f"  - ToolNode, {len(PAIRS) // 2} slots:     {bounded:.3f}s ({bounded / LATENCY_SECONDS:.1f}x latency)")
+    print("-" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    # The bound is created per run, so a second event loop works as well.
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""Benchmark: admission order and fairness of the request scheduler
+
+Checks that waiting requests are admitted by priority class and round-robin per
+client, that a cancelled waiter gives up its place, and that the executor keys
+callers without an X-Client-Id header by something stable across their
+conversations. Then one client floods the scheduler with new conversations
+while a second sends a few, and the second client's queue time is compared
+between per-caller keys and the old per-conversation keys."""
+
+import os
+os.environ.setdefault('ENABLE_TRACING', 'false')
+
+import asyncio
+import time
+from uuid import uuid4
+from a2a.server.agent_execution import RequestContext
+from a2a.server.context import ServerCallContext
+from a2a.types import Message, MessageSendParams, Part, Role, TextPart
+from app.a2a_agent_executor import CurrencyAgentExecutor
+from app.scheduler import Priority, RequestScheduler
+
+FLOOD_REQUESTS = 200
+LIGHT_REQUESTS = 10
+MAX_CONCURRENT = 4
+HOLD_SECONDS = 0.01
+
+class StubAgent:
+    async def stream(self, query, context_id):
+        yield {'is_task_complete': True, 'require_user_input': False, 'content': 'done'}
+
+async def admission_order() -> list[str]:
+    scheduler = RequestScheduler(max_concurrent=1)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def request(name: str, client: str, priority: Priority, hold: bool = False) -> None:
+        async with scheduler.slot(client, priority):
+            order.append(name)
+            if hold:
+                await release.wait()
+
+    blocker = asyncio.create_task(request('blocker', 'x', Priority.NEW_CONVERSATION, hold=True))
+    await asyncio.sleep(0)
+    waiters = {
+        name: asyncio.create_task(request(name, client, priority))
+        for name, client, priority in (
+            ('a1', 'a', Priority.NEW_CONVERSATION),
+            ('a2', 'a', Priority.NEW_CONVERSATION),
+            ('a3', 'a', Priority.NEW_CONVERSATION),
+            ('b1', 'b', Priority.NEW_CONVERSATION),
+            ('c1', 'c', Priority.FAST_PATH),
+            ('d1', 'd', Priority.CONTINUATION),
+        )
+    }
+    await asyncio.sleep(0)
+    waiters['a2'].cancel()
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(blocker, *waiters.values(), return_exceptions=True)
+    stats = scheduler.stats()
+    assert stats['running'] == 0 and scheduler.queued() == 0, stats
+    return order
+
+def client_keys() -> list[str]:
+    executor = CurrencyAgentExecutor(StubAgent())
+
+    def context(headers: dict, peer: str) -> RequestContext:
+        message = Message(role=Role.user, parts=[Part(root=TextPart(text='1 USD in EUR?'))],
+                          message_id=uuid4().hex)
+        call_context = ServerCallContext(state={'headers': headers, 'peer': peer})
+        return RequestContext(request=MessageSendParams(message=message), call_context=call_context)
+
+    return [
+        executor._client(ctx, ctx.call_context.state['headers'])  # type: ignore[union-attr]
+        for ctx in (
+            context({}, '10.0.0.1'),
+            context({}, '10.0.0.1'),
+            context({'x-client-id': 'billing'}, '10.0.0.1'),
+        )
+    ]
+
+async def flood(per_caller: bool) -> tuple[float, float]:
+    scheduler = RequestScheduler(max_concurrent=MAX_CONCURRENT)
+    waits: list[float] = []
+
+    async def request(client: str, light: bool) -> None:
+        start = time.perf_counter()
+        async with scheduler.slot(client, Priority.NEW_CONVERSATION):
+            if light:
+                waits.append(time.perf_counter() - start)
+            await asyncio.sleep(HOLD_SECONDS)
+
+    tasks = [
+        asyncio.create_task(request('heavy' if per_caller else uuid4().hex, False))
+        for _ in range(FLOOD_REQUESTS)
+    ]
+    await asyncio.sleep(0)
+    tasks += [
+        asyncio.create_task(request('light' if per_caller else uuid4().hex, True))
+        for _ in range(LIGHT_REQUESTS)
+    ]
+    await asyncio.gather(*tasks)
+    return sum(waits) / len(waits), max(waits)
+
+async def main() -> None:
+    print("=" * 60)
+    print("Benchmark: request scheduler")
+    print("=" * 60)
+    order = await admission_order()
+    expected = ['blocker', 'd1', 'c1', 'a1', 'b1', 'a3']
+    assert order == expected, order
+    print(f"  - Admission order: {order}")
+
+    keys = client_keys()
+    assert keys[0] == keys[1] and keys[2] == 'id:billing', keys
+    print(f"  - Client keys (two conversations from one peer, then a header): {keys}")
+
+    print(f"  - Flood: {FLOOD_REQUESTS} + {LIGHT_REQUESTS} requests, "
+          f"{MAX_CONCURRENT} slots, {HOLD_SECONDS * 1000:.0f}ms each")
+    for label, per_caller in (('per-conversation keys', False), ('per-caller keys', True)):
+        avg, worst = await flood(per_caller)
+        print(f"  - {label:<22} light client waits avg {avg * 1000:6.1f}ms, max {worst * 1000:6.1f}ms")
+    print("-" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Benchmark: status events and serialization cost per request
+
+Drives CurrencyAgentExecutor with a stub agent that streams a burst of working
+updates (as a multi-round ReAct loop does) and then completes. Every enqueued
+event is serialized the way the SSE response does, and the CPU time and number
+of events are reported for the default and the lean configuration, once for an
+instant burst and once with the updates paced out so coalescing timers fire."""
+
+import os
+os.environ.setdefault('ENABLE_TRACING', 'false')
+os.environ.setdefault('RATE_PREFETCH_ENABLED', 'false')
+
+import asyncio
+import time
+from uuid import uuid4
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import Message, MessageSendParams, Part, Role, TextPart
+from app.a2a_agent_executor import CurrencyAgentExecutor
+
+REQUESTS = 500
+PACED_REQUESTS = 100
+PACE_SECONDS = 0.002
+TOOL_ROUNDS = 4
+
+class StubAgent:
+    def __init__(self, pace: float = 0):
+        self.pace = pace
+
+    async def stream(self, query, context_id):
+        for _ in range(TOOL_ROUNDS):
+            for content in ('Looking up the exchange rates ... ', 'Processing the exchange rates ... '):
+                if self.pace:
+                    await asyncio.sleep(self.pace)
+                yield {'is_task_complete': False, 'require_user_input': False, 'content': content}
+        yield {
+            'is_task_complete': True,
+            'require_user_input': False,
+            'content': 'Based on the latest exchange rate, 1 USD is equivalent to 0.9 EUR.',
+        }
+
+def request_context() -> RequestContext:
+    message = Message(
+        role=Role.user,
+        parts=[Part(root=TextPart(text='How much is 1 USD in EUR?'))],
+        message_id=uuid4().hex,
+    )
+    return RequestContext(request=MessageSendParams(message=message))
+
+async def run(executor: CurrencyAgentExecutor, requests: int = REQUESTS) -> tuple[float, int]:
+    events = 0
+    start = time.process_time()
+    for _ in range(requests):
+        queue = EventQueue()
+        await executor.execute(request_context(), queue)
+        while not queue.queue.empty():
+            event = await queue.dequeue_event(no_wait=True)
+            event.model_dump_json(exclude_none=True)
+            events += 1
+    return time.process_time() - start, events
+
+async def main() -> None:
+    print("=" * 60)
+    print("Benchmark: status update events per request")
+    print("=" * 60)
+    print(f"  - Requests: {REQUESTS}")
+    print(f"  - Working updates per request: {TOOL_ROUNDS * 2}")
+    print("-" * 60)
+
+    await run(CurrencyAgentExecutor(StubAgent(), coalesce_ms=0, dedupe_status=False))  # warm up
+    for pace, requests in ((0, REQUESTS), (PACE_SECONDS, PACED_REQUESTS)):
+        print(f"  Updates {pace * 1000:.0f}ms apart:")
+        configs = {
+            # Server defaults: STATUS_COALESCE_MS and STATUS_DEDUPE unset.
+            'default': CurrencyAgentExecutor(StubAgent(pace)),
+            'dedupe': CurrencyAgentExecutor(StubAgent(pace), coalesce_ms=0, dedupe_status=True),
+            'coalesce 5ms': CurrencyAgentExecutor(StubAgent(pace), coalesce_ms=5, dedupe_status=False),
+            'both': CurrencyAgentExecutor(StubAgent(pace), coalesce_ms=5, dedupe_status=True),
+        }
+        for name, executor in configs.items():
+            cpu, events = await run(executor, requests)
+            print(f"  - {name:<13} {cpu / requests * 1e6:8.1f}us CPU/request, "
+                  f"{events / requests:.1f} events/request")
+    print("-" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Soak test: process memory over 100k A2A requests
+
+Sends `message/send` requests through DefaultRequestHandler and
+CurrencyAgentExecutor (with a stub agent in place of the LLM) and prints the
+process RSS and task store counters every 10k requests. With RetentionTaskStore
+the RSS levels off once the count cap is reached; pass --baseline to run the
+same load against a plain InMemoryTaskStore for comparison, and --failing to
+use an agent that raises mid-run, so every task ends up failed."""
+
+import os
+os.environ.setdefault('ENABLE_TRACING', 'false')
+os.environ.setdefault('RATE_PREFETCH_ENABLED', 'false')
+
+import asyncio
+import logging
+import sys
+import time
+from uuid import uuid4
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.utils.errors import ServerError
+from a2a.types import Message, MessageSendParams, Part, Role, TextPart
+from app.a2a_agent_executor import CurrencyAgentExecutor
+from app.task_store import RetentionTaskStore
+
+REQUESTS = 100_000
+REPORT_EVERY = 10_000
+MAX_TASKS = 1_000
+
+class StubAgent:
+    async def stream(self, query, context_id):
+        yield {'is_task_complete': False, 'require_user_input': False,
+               'content': 'Looking up the exchange rates ... '}
+        yield {'is_task_complete': False, 'require_user_input': False,
+               'content': 'Processing the exchange rates ... '}
+        yield {'is_task_complete': True, 'require_user_input': False,
+               'content': 'Based on the latest exchange rate, 1 USD is equivalent to 0.9 EUR.'}
+
+class FailingAgent:
+    async def stream(self, query, context_id):
+        yield {'is_task_complete': False, 'require_user_input': False,
+               'content': 'Looking up the exchange rates ... '}
+        raise RuntimeError('LLM unavailable')
+
+def rss_mb() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+
+def message_params() -> MessageSendParams:
+    return MessageSendParams(message=Message(
+        role=Role.user,
+        parts=[Part(root=TextPart(text='How much is 1 USD in EUR?'))],
+        message_id=uuid4().hex,
+    ))
+
+async def main() -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    baseline = '--baseline' in sys.argv
+    failing = '--failing' in sys.argv
+    logging.getLogger('app.a2a_agent_executor').setLevel(logging.CRITICAL)
+    task_store = InMemoryTaskStore() if baseline else RetentionTaskStore(
+        InMemoryTaskStore(), max_tasks=MAX_TASKS
+    )
+    handler = DefaultRequestHandler(
+        agent_executor=CurrencyAgentExecutor(FailingAgent() if failing else StubAgent()),
+        task_store=task_store,
+    )
+
+    print("=" * 60)
+    print(f"Soak test: {type(task_store).__name__}{', failing agent' if failing else ''}")
+    print("=" * 60)
+    start = time.perf_counter()
+    for i in range(1, REQUESTS + 1):
+        try:
+            await handler.on_message_send(message_params())
+        except ServerError:
+            if not failing:
+                raise
+        if i % REPORT_EVERY == 0:
+            stats = task_store.stats() if not baseline else {'tasks': len(task_store.tasks)}
+            print(f"  - {i:>7,} requests  RSS {rss_mb():7.1f} MB  "
+                  f"tasks {stats['tasks']:>7,}  {time.perf_counter() - start:6.1f}s  "
+                  f"evicted {stats.get('evicted', {})}")
+    print("-" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main())